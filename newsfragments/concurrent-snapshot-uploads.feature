@@ -0,0 +1 @@
+The content and metadata of a snapshot are now uploaded to Tahoe-LAFS concurrently instead of one after the other.
@@ -0,0 +1 @@
+magic-folder now keeps its HTTP connections to the Tahoe-LAFS node open between requests instead of opening a new connection for each one.
@@ -18,9 +18,6 @@ from zope.interface import (
 
 import attr
 
-from io import (
-    BytesIO,
-)
 from eliot import (
     start_action,
     log_call,
@@ -43,8 +40,11 @@ from twisted.logger import (
 
 from twisted.web.client import (
     Agent,
+    HTTPConnectionPool,
     readBody,
-    FileBodyProducer,
+)
+from twisted.web.iweb import (
+    IBodyProducer,
 )
 from twisted.python.filepath import (
     FilePath,
@@ -556,17 +556,25 @@ class MagicFolderService(MultiService):
     :ivar reactor: the Twisted reactor to use
 
     :ivar GlobalConfigDatabase config: our system configuration
+
+    :ivar HTTPConnectionPool _http_pool: the pool of persistent connections
+        to the Tahoe-LAFS node used by the TahoeClient we create (if we
+        create one).
     """
     reactor = attr.ib()
     config = attr.ib()
     tahoe_client = attr.ib(default=None)
+    _http_pool = attr.ib(default=None, init=False)
 
     def __attrs_post_init__(self):
         MultiService.__init__(self)
         if self.tahoe_client is None:
+            # Every folder talks to the same Tahoe-LAFS node for the life of
+            # the process so keep connections open between requests.
+            self._http_pool = HTTPConnectionPool(self.reactor, persistent=True)
             self.tahoe_client = TahoeClient(
                 self.config.tahoe_client_url,
-                HTTPClient(Agent(self.reactor)),
+                HTTPClient(Agent(self.reactor, pool=self._http_pool)),
             )
         self._listen_endpoint = serverFromString(
             self.reactor,
@@ -688,8 +696,11 @@ class MagicFolderService(MultiService):
 
     def stopService(self):
         self._starting.cancel()
-        MultiService.stopService(self)
-        return self._starting
+        d = MultiService.stopService(self)
+        if self._http_pool is not None:
+            d.addCallback(lambda ignored: self._http_pool.closeCachedConnections())
+        d.addCallback(lambda ignored: self._starting)
+        return d
 
 
 @implementer(IDirectoryNode)
@@ -740,11 +751,92 @@ class Node(object):
             )
             return d.addActionFinish()
 
+@implementer(IBodyProducer)
+@attr.s
+class _UploadableProducer(object):
+    """
+    An ``IBodyProducer`` which streams the contents of an ``IUploadable`` a
+    chunk at a time instead of reading all of it into memory first.
+
+    Reading waits while the consumer has paused production.  Once
+    production is stopped no more data is written and the ``Deferred``
+    returned by ``startProducing`` never fires.  Cancelling that ``Deferred``
+    stops production.
+
+    :ivar uploadable: The ``IUploadable`` to read from.
+
+    :ivar int length: The number of bytes the uploadable will produce.
+
+    :ivar int chunk_size: The most bytes to read from the uploadable at once.
+    """
+    _uploadable = attr.ib()
+    length = attr.ib()
+    _chunk_size = attr.ib(default=64 * 1024)
+
+    # While paused, a Deferred which fires when production may continue.
+    _paused = attr.ib(default=None, init=False)
+    _stopped = attr.ib(default=False, init=False)
+
+    def startProducing(self, consumer):
+        finished = Deferred(lambda ignored: self.stopProducing())
+
+        def produced(ignored):
+            if not self._stopped:
+                finished.callback(None)
+
+        def failed(reason):
+            if not self._stopped:
+                finished.errback(reason)
+
+        self._produce(consumer).addCallbacks(produced, failed)
+        return finished
+
+    @inline_callbacks
+    def _produce(self, consumer):
+        remaining = self.length
+        while remaining > 0:
+            if self._paused is not None:
+                yield self._paused
+            if self._stopped:
+                return
+            chunks = yield self._uploadable.read(min(self._chunk_size, remaining))
+            if self._stopped:
+                return
+            if not chunks:
+                break
+            for chunk in chunks:
+                consumer.write(chunk)
+                remaining -= len(chunk)
+
+    def pauseProducing(self):
+        if self._paused is None:
+            self._paused = Deferred()
+
+    def resumeProducing(self):
+        paused, self._paused = self._paused, None
+        if paused is not None:
+            paused.callback(None)
+
+    def stopProducing(self):
+        self._stopped = True
+        # Let a paused _produce notice that it has been stopped.
+        self.resumeProducing()
+
+
 @attr.s(frozen=True)
 class TahoeClient(object):
     node_uri = attr.ib()
     treq = attr.ib()
 
+    # The node URL never changes so render the upload endpoint once.
+    _uri_root = attr.ib(
+        init=False,
+        default=attr.Factory(
+            lambda self: self.node_uri.child(u"uri").to_uri().to_text().encode("ascii"),
+            takes_self=True,
+        ),
+    )
+
     def get_welcome(self):
         return self.treq.get(
             self.node_uri.add(u"t", u"json").to_uri().to_text().encode("ascii"),
@@ -815,11 +907,8 @@ class TahoeClient(object):
     @inline_callbacks
     def add_file(self, dirnode_uri, name, uploadable, metadata, overwrite, progress):
         size = yield uploadable.get_size()
-        contents = b"".join((yield uploadable.read(size)))
 
-        uri = self.node_uri.child(
-            u"uri",
-        ).to_uri().to_text().encode("ascii")
+        uri = self._uri_root
         action = start_action(
             action_type=u"magic-folder:cli:add_file:put",
             uri=uri,
@@ -828,7 +917,7 @@ class TahoeClient(object):
         with action:
             upload_response = yield self.treq.put(
                 uri,
-                bodyProducer=FileBodyProducer(BytesIO(contents)),
+                data=_UploadableProducer(uploadable, size),
             )
 
             if upload_response.code != 200:
@@ -858,19 +947,15 @@ class TahoeClient(object):
         with action:
             response = yield self.treq.post(
                 uri,
-                bodyProducer=FileBodyProducer(
-                    BytesIO(
-                        json.dumps({
-                            name: [
-                                u"filenode", {
-                                    "ro_uri": filecap,
-                                    "size": size,
-                                    "metadata": metadata,
-                                },
-                            ],
-                        }).encode("utf-8"),
-                    ),
-                ),
+                data=json.dumps({
+                    name: [
+                        u"filenode", {
+                            "ro_uri": filecap,
+                            "size": size,
+                            "metadata": metadata,
+                        },
+                    ],
+                }).encode("utf-8"),
             )
             if response.code != 200:
                 raise Exception("Error response from metadata endpoint: {code} {phrase}".format(
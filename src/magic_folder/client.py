@@ -195,8 +195,7 @@ def create_testing_http_client(reactor, config, global_service, get_api_token):
         in-memory objects. These objects obtain their data from the
         service provided
     """
-    v1_resource = APIv1(config, global_service)
-    root = magic_folder_resource(get_api_token, v1_resource)
+    root = create_testing_resource(config, global_service, get_api_token)
     client = HTTPClient(
         agent=RequestTraversalAgent(root),
         data_to_body_producer=_SynchronousProducer,
@@ -204,6 +203,22 @@ def create_testing_http_client(reactor, config, global_service, get_api_token):
     return client
 
 
+def create_testing_resource(config, global_service, get_api_token):
+    """
+    :param global_service: an object providing the API of the global
+        magic-folder service
+
+    :param callable get_api_token: a no-argument callable that returns
+        the current API token.
+
+    :returns IResource: the root of the HTTP API resource hierarchy,
+        obtaining its data from the service provided.  Requests can be
+        rendered against it directly, without any HTTP client.
+    """
+    v1_resource = APIv1(config, global_service)
+    return magic_folder_resource(get_api_token, v1_resource)
+
+
 def create_magic_folder_client(reactor, config, http_client):
     """
     Create a new MagicFolderClient instance that is speaking to the
@@ -238,6 +253,27 @@ def url_to_bytes(url):
     return url.to_uri().to_text().encode("ascii")
 
 
+# Only one API token is in use at a time so only the most recent header is
+# remembered.
+_authorization_headers = {}
+
+def _authorization_header(auth_token):
+    """
+    Get the value of an **Authorization** header presenting the given token.
+
+    :param unicode auth_token: The Magic Folder authorization token.
+
+    :return bytes: The header value.
+    """
+    try:
+        return _authorization_headers[auth_token]
+    except KeyError:
+        header = u"Bearer {}".format(auth_token).encode("ascii")
+        _authorization_headers.clear()
+        _authorization_headers[auth_token] = header
+        return header
+
+
 def authorized_request(http_client, auth_token, method, url):
     """
     Perform a request of the given url with the given client, request method,
@@ -255,7 +291,7 @@ def authorized_request(http_client, auth_token, method, url):
     :return: Whatever ``treq.request`` returns.
     """
     headers = {
-        b"Authorization": u"Bearer {}".format(auth_token).encode("ascii"),
+        b"Authorization": _authorization_header(auth_token),
     }
     return http_client.request(
         method,
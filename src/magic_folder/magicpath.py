@@ -1,35 +1,55 @@
-import re
 import os.path
 
-from allmydata.util.assertutil import precondition, _assert
+from allmydata.util.assertutil import precondition
 
 def path2magic(path):
-    return re.sub(u'[/@]',  lambda m: {u'/': u'@_', u'@': u'@@'}[m.group(0)], path)
+    return path.replace(u'@', u'@@').replace(u'/', u'@_')
 
 def magic2path(path):
-    return re.sub(u'@[_@]', lambda m: {u'@_': u'/', u'@@': u'@'}[m.group(0)], path)
+    # Every '@' in a mangled path begins a two character escape so splitting
+    # on '@@' first leaves only '@_' escapes behind in each piece.
+    return u'@'.join(
+        piece.replace(u'@_', u'/')
+        for piece
+        in path.split(u'@@')
+    )
 
 
-IGNORE_SUFFIXES = [u'.backup', u'.tmp', u'.conflict']
+IGNORE_SUFFIXES = (u'.backup', u'.tmp', u'.conflict')
 IGNORE_PREFIXES = [u'.']
 
 def should_ignore_file(path_u):
     precondition(isinstance(path_u, unicode), path_u=path_u)
 
-    for suffix in IGNORE_SUFFIXES:
-        if path_u.endswith(suffix):
-            return True
+    if path_u.endswith(IGNORE_SUFFIXES):
+        return True
 
-    while path_u != u"":
-        oldpath_u = path_u
-        path_u, tail_u = os.path.split(path_u)
-        if tail_u.startswith(u"."):
-            return True
-        if path_u == oldpath_u:
-            return True  # the path was absolute
-        _assert(len(path_u) < len(oldpath_u), path_u=path_u, oldpath_u=oldpath_u)
+    if os.path.isabs(path_u):
+        return True
 
-    return False
+    if os.path.altsep is not None:
+        path_u = path_u.replace(os.path.altsep, os.path.sep)
+    return any(
+        segment.startswith(u".")
+        for segment
+        in path_u.split(os.path.sep)
+    )
+
+def filter_non_ignored(paths):
+    """
+    Select the paths which ``should_ignore_file`` would not ignore.
+
+    :param list[unicode] paths: The relative paths to consider.
+
+    :returns list[unicode]: The elements of ``paths`` which are not ignored,
+        in their original order.
+    """
+    return [
+        path_u
+        for path_u
+        in paths
+        if not should_ignore_file(path_u)
+    ]
 
 def mangle_path(p):
     """
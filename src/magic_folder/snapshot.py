@@ -41,6 +41,10 @@ from nacl.encoding import (
     Base64Encoder,
 )
 
+from .util.jsonutil import (
+    dumps,
+)
+
 # version of the snapshot scheme
 SNAPSHOT_VERSION = 1
 
@@ -283,7 +287,7 @@ class LocalSnapshot(object):
             serialized = {
                 'name' : local_snapshot.name,
                 'metadata' : local_snapshot.metadata,
-                'identifier': unicode(local_snapshot.identifier),
+                'identifier': local_snapshot.identifier,
                 'content_path' : local_snapshot.content_path.path,
                 'parents_local' : [
                     _serialized_dict(parent)
@@ -296,7 +300,7 @@ class LocalSnapshot(object):
 
         serialized = _serialized_dict(self)
 
-        return (json.dumps(serialized))
+        return dumps(serialized)
 
     @classmethod
     def from_json(cls, serialized, author):
@@ -559,15 +563,9 @@ def format_filenode(cap, metadata=None):
     :return: The Tahoe-LAFS representation of a filenode with this
         information.
     """
-    node = {
-        u"ro_uri": cap,
-    }
-    if metadata is not None:
-        node[u"metadata"] = metadata
-    return [
-        u"filenode",
-        node,
-    ]
+    if metadata is None:
+        return [u"filenode", {u"ro_uri": cap}]
+    return [u"filenode", {u"ro_uri": cap, u"metadata": metadata}]
 
 
 
@@ -614,9 +612,6 @@ def write_snapshot_to_tahoe(snapshot, author_key, tahoe_client):
             parents_raw.append(parent_remote_snapshot.capability)
             snapshot.parents_local.remove(parent)  # the shallow-copy to_upload not affected
 
-    # upload the content itself
-    content_cap = yield tahoe_client.create_immutable(snapshot.get_content_producer())
-
     # create our metadata
     snapshot_metadata = {
         "snapshot_version": SNAPSHOT_VERSION,
@@ -627,9 +622,13 @@ def write_snapshot_to_tahoe(snapshot, author_key, tahoe_client):
             for parent_cap in parents_raw
         ]
     }
-    metadata_cap = yield tahoe_client.create_immutable(
-        json.dumps(snapshot_metadata)
-    )
+
+    # upload the content itself and the metadata.  Neither depends on the
+    # other so there's no reason to wait for one before starting the other.
+    content_cap, metadata_cap = yield tahoe_client.create_immutables([
+        snapshot.get_content_producer(),
+        dumps(snapshot_metadata),
+    ])
 
     # sign the snapshot (which can only happen after we have the
     # content-capability and metadata-capability)
@@ -1,9 +1,10 @@
 # Copyright 2020 Least Authority TFA GmbH
 # See COPYING for details.
 
-import json
-
 from twisted.internet.defer import (
+    DeferredSemaphore,
+    FirstError,
+    gatherResults,
     inlineCallbacks,
     returnValue,
 )
@@ -26,6 +27,10 @@ from treq.testing import (
 
 import attr
 
+from .util.jsonutil import (
+    dumps,
+)
+
 
 def _request(http_client, method, url, **kwargs):
     """
@@ -116,6 +121,26 @@ def _get_content_check_code(acceptable_codes, res):
     returnValue(body)
 
 
+def _gather_results(deferreds):
+    """
+    Like ``gatherResults`` but if any of the Deferreds fails, the result
+    fails with that Deferred's failure instead of a ``FirstError``.
+
+    :param [Deferred] deferreds: The Deferreds to wait for.
+
+    :return Deferred[list]: The results of ``deferreds``, in order.
+    """
+    def unwrap(reason):
+        reason.trap(FirstError)
+        return reason.value.subFailure
+    return gatherResults(deferreds, consumeErrors=True).addErrback(unwrap)
+
+
+# The most uploads ``TahoeClient.create_immutables`` will have in progress at
+# once.
+_MAX_CONCURRENT_UPLOADS = 16
+
+
 @attr.s
 class TahoeClient(object):
     """
@@ -137,6 +162,19 @@ class TahoeClient(object):
         validator=attr.validators.instance_of((HTTPClient, StubTreq)),
     )
 
+    _upload_semaphore = attr.ib(
+        default=attr.Factory(lambda: DeferredSemaphore(_MAX_CONCURRENT_UPLOADS)),
+        init=False,
+    )
+
+    # The encoded request path of the ``/uri`` resource.  Most requests are
+    # made against this with at most a fixed query string so there is no
+    # need to build and serialize a new URL for each of them.
+    _uri_root = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self._uri_root = self.url.child(u"uri").to_uri().to_text().encode("ascii")
+
     @inlineCallbacks
     def create_immutable_directory(self, directory_data):
         """
@@ -149,14 +187,10 @@ class TahoeClient(object):
 
         :returns: a capability-string
         """
-        post_uri = self.url.child(u"uri").replace(
-            query=[(u"t", u"mkdir-immutable")],
-        )
-        res = yield _request(
-            self.http_client,
+        res = yield self.http_client.request(
             b"POST",
-            post_uri,
-            data=json.dumps(directory_data),
+            self._uri_root + b"?t=mkdir-immutable",
+            data=dumps(directory_data),
         )
         capability_string = yield _get_content_check_code({OK, CREATED}, res)
         returnValue(capability_string)
@@ -174,16 +208,32 @@ class TahoeClient(object):
         :return Deferred[bytes]: A Deferred which fires with the capability
             string for the new immutable object.
         """
-        put_uri = self.url.child(u"uri")
-        res = yield _request(
-            self.http_client,
+        res = yield self.http_client.request(
             b"PUT",
-            put_uri,
+            self._uri_root,
             data=producer,
         )
         capability_string = yield _get_content_check_code({OK, CREATED}, res)
         returnValue(capability_string)
 
+    def create_immutables(self, producers):
+        """
+        Creates several new immutables in Tahoe.  The uploads proceed
+        concurrently though only a limited number are in progress at once.
+
+        :param producers: a list of anything ``create_immutable`` accepts.
+
+        :return Deferred[[bytes]]: A Deferred which fires with the capability
+            strings for the new immutable objects, in the same order as
+            ``producers``.  If any upload fails, it fails with that upload's
+            failure.
+        """
+        return _gather_results([
+            self._upload_semaphore.run(self.create_immutable, producer)
+            for producer
+            in producers
+        ])
+
     @inlineCallbacks
     def create_mutable_directory(self):
         """
@@ -192,13 +242,9 @@ class TahoeClient(object):
         :return Deferred[bytes]: The write capability string for the new
             directory.
         """
-        post_uri = self.url.child(u"uri").replace(
-            query=[(u"t", u"mkdir")],
-        )
-        response = yield _request(
-            self.http_client,
+        response = yield self.http_client.request(
             b"POST",
-            post_uri,
+            self._uri_root + b"?t=mkdir",
         )
         # Response code should probably be CREATED but it seems to be OK
         # instead.  Not sure if this is the real Tahoe-LAFS behavior or an
@@ -273,7 +319,9 @@ class TahoeClient(object):
     @inlineCallbacks
     def download_capability(self, cap):
         """
-        Retrieve the raw data for a capability from Tahoe
+        Retrieve the raw data for a capability from Tahoe.  All of the data
+        is held in memory; use ``stream_capability`` for content which may
+        be large.
 
         :param cap: a capability-string
 
@@ -306,9 +354,16 @@ class TahoeClient(object):
         get_uri = self.url.child(u"uri").replace(
             query=[(u"uri", cap.decode("ascii"))],
         )
-        res = yield self.http_client.get(get_uri.to_text())
+        res = yield _request(
+            self.http_client,
+            b"GET",
+            get_uri,
+        )
         if res.code != OK:
-            raise TahoeAPIError(res.code, None)
+            # Read the (small) error body so the connection is released and
+            # the error can say what went wrong.
+            body = yield res.content()
+            raise TahoeAPIError(res.code, body)
         yield res.collect(filelike.write)
 
 
@@ -12,6 +12,7 @@ __all__ = [
 
 import os
 import tempfile
+from shutil import rmtree
 from functools import partial
 from unittest import case as _case
 from socket import (
@@ -372,6 +373,21 @@ def make_verifier_uri():
     return uri.SSKVerifierURI(storage_index=os.urandom(16),
                               fingerprint=os.urandom(32)).to_string()
 
+def write_content(path, content):
+    """
+    Write bytes to a file, replacing any existing content.
+
+    Unlike ``FilePath.setContent`` this writes the file in place rather than
+    writing a temporary sibling and renaming it, which is all a test needs.
+
+    :param FilePath path: The file to write.
+
+    :param bytes content: The bytes to write.
+    """
+    with open(path.asBytesMode("utf-8").path, "wb") as f:
+        f.write(content)
+
+
 class LoggingServiceParent(service.MultiService):
     def log(self, *args, **kwargs):
         return log.msg(*args, **kwargs)
@@ -530,6 +546,72 @@ class _TestCaseMixin(object):
     def assertRaises(self, *a, **kw):
         return self._dummyCase.assertRaises(*a, **kw)
 
+    def successResultOf(self, deferred):
+        """
+        Get the result of a ``Deferred`` which has already succeeded.
+
+        This is cheaper than matching it with ``succeeded(Always())``.
+
+        :param Deferred deferred: The ``Deferred`` to inspect.
+
+        :raise failureException: If ``deferred`` has no result yet or has
+            failed.
+
+        :return: The result of ``deferred``.
+        """
+        results = []
+        deferred.addBoth(results.append)
+        if not results:
+            self.fail(
+                "Success result expected on {!r}, found no result "
+                "instead".format(deferred),
+            )
+        [result] = results
+        if isinstance(result, failure.Failure):
+            self.fail(
+                "Success result expected on {!r}, found failure result "
+                "instead:\n{}".format(deferred, result.getTraceback()),
+            )
+        return result
+
+
+def _temporary_root():
+    """
+    Create a new, empty directory for a test to keep its files in.
+
+    :return bytes: The path of the directory.  It is in a memory-backed
+        filesystem if one is available.
+    """
+    shm = b"/dev/shm"
+    return tempfile.mkdtemp(dir=shm if os.path.isdir(shm) else None)
+
+
+class TemporaryRootMixin(object):
+    """
+    A mixin for test cases which places the paths from ``mktemp``
+    beneath a single per-test directory, in memory if possible, rather than
+    in the working directory.  The directory is removed after the test.
+    """
+    def setUp(self):
+        super(TemporaryRootMixin, self).setUp()
+        self._tmproot = FilePath(_temporary_root())
+        self.addCleanup(rmtree, self._tmproot.path)
+
+    def mktemp(self):
+        return self._tmproot.child(b"tmp").temporarySibling().path
+
+    def temporary_paths(self, *names):
+        """
+        Get several new paths which can be used for new files or directories.
+
+        :param [unicode] names: The names of the paths.
+
+        :return [FilePath]: Non-existent children of one new directory, one
+            for each name.
+        """
+        root = FilePath(tempfile.mkdtemp(dir=self._tmproot.path))
+        return [root.child(name) for name in names]
+
 
 class SyncTestCase(_TestCaseMixin, TestCase):
     """
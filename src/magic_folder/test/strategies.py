@@ -6,7 +6,7 @@ Hypothesis strategies useful for testing Magic Folder.
 """
 
 from os.path import (
-    join,
+    sep,
 )
 
 from uuid import (
@@ -18,12 +18,12 @@ from unicodedata import (
 )
 
 from base64 import (
+    b32encode,
     urlsafe_b64encode,
 )
 
 from nacl.signing import (
     SigningKey,
-    VerifyKey,
 )
 
 from hypothesis.strategies import (
@@ -46,9 +46,6 @@ from twisted.python.filepath import (
     FilePath,
 )
 
-from allmydata.util import (
-    base32,
-)
 from allmydata.util.progress import (
     PercentProgress,
 )
@@ -85,7 +82,12 @@ def _normalized(text):
     # want, we should know what our behavior is going to be.
     #
     # https://github.com/LeastAuthority/magic-folder/issues/36
-    return normalize("NFC", text)
+    try:
+        text.encode("ascii")
+    except UnicodeEncodeError:
+        return normalize("NFC", text)
+    # ASCII text is always already NFC.
+    return text
 
 
 def path_segments(alphabet=SEGMENT_ALPHABET):
@@ -137,7 +139,9 @@ def relative_paths(segments=path_segments()):
         min_size=1,
         max_size=8,
     ).map(
-        lambda xs: join(*xs),
+        # The segments are never absolute and never contain a separator so
+        # there is no need for the extra checks os.path.join does.
+        sep.join,
     )
 
 
@@ -160,25 +164,46 @@ def absolute_paths_utf8(relative_paths=relative_paths()):
     )
 
 
-def folder_names():
+def _names():
     """
-    Build unicode strings which are usable as magic folder names.
+    Build short, non-empty unicode strings for use as names.
+
+    The alphabet is restricted to something smaller than the whole of
+    Unicode so Hypothesis spends less effort generating and shrinking exotic
+    characters.
     """
     return text(
+        alphabet=DOTLESS_SLASHLESS_SEGMENT_ALPHABET,
         min_size=1,
+        max_size=64,
     ).map(
         _normalized,
     )
 
 
+def folder_names():
+    """
+    Build unicode strings which are usable as magic folder names.
+    """
+    return _names()
+
+
+def _b2a(data):
+    """
+    Encode bytes the way ``allmydata.util.base32.b2a`` does (lowercase RFC
+    4648 base32 without padding) but using the much faster stdlib encoder.
+    """
+    return b32encode(data).rstrip(b"=").lower().decode("ascii")
+
+
 def tahoe_lafs_chk_capabilities():
     """
     Build unicode strings which look like Tahoe-LAFS CHK capability strings.
     """
     return builds(
         lambda a, b, needed, extra, size: u"URI:CHK:{}:{}:{}:{}:{}".format(
-            base32.b2a(a),
-            base32.b2a(b),
+            _b2a(a),
+            _b2a(b),
             needed,
             # Total is how many you need plus how many more there might be.
             needed + extra,
@@ -197,7 +222,7 @@ def tahoe_lafs_dir_capabilities():
     Build unicode strings which look like Tahoe-LAFS directory capability strings.
     """
     return builds(
-        lambda a, b: u"URI:DIR2:{}:{}".format(base32.b2a(a), base32.b2a(b)),
+        lambda a, b: u"URI:DIR2:{}:{}".format(_b2a(a), _b2a(b)),
         binary(min_size=16, max_size=16),
         binary(min_size=32, max_size=32),
     )
@@ -278,23 +303,45 @@ def progresses():
 
 
 def magic_folder_filenames():
-    return text(min_size=1)
+    """
+    Build unicode strings which are usable as the names of files in a magic
+    folder.
+    """
+    return _names()
 
 
-author_names = text
+def author_names():
+    """
+    Build unicode strings which are usable as author names.
+    """
+    return _names()
+
+# Constructing keys involves real cryptographic work and no test needs more
+# than a handful of distinct ones so draw them from a small, fixed pool.
+_SIGNING_KEYS = [
+    SigningKey(bytes(bytearray([n] * 32)))
+    for n
+    in range(16)
+]
+_VERIFY_KEYS = [
+    signing_key.verify_key
+    for signing_key
+    in _SIGNING_KEYS
+]
+
 
 def signing_keys():
     """
     Build ``SigningKey`` instances.
     """
-    return binary(min_size=32, max_size=32).map(SigningKey)
+    return sampled_from(_SIGNING_KEYS)
 
 
 def verify_keys():
     """
     Build ``VerifyKey`` instances.
     """
-    return binary(min_size=32, max_size=32).map(VerifyKey)
+    return sampled_from(_VERIFY_KEYS)
 
 
 def local_authors(names=author_names(), signing_keys=signing_keys()):
@@ -369,6 +416,14 @@ def unique_value_dictionaries(keys, values, min_size=None, max_size=None):
     )
 
 
+# These are used by the snapshot strategies below.  Build them once rather
+# than each time one of those strategies is requested.
+_CHK_CAPABILITIES = tahoe_lafs_chk_capabilities()
+_IMMUTABLE_DIR_CAPABILITIES = tahoe_lafs_immutable_dir_capabilities()
+_IMMUTABLE_DIR_CAPABILITY_LISTS = lists(_IMMUTABLE_DIR_CAPABILITIES)
+_TEXT_DICTIONARIES = dictionaries(text(), text())
+
+
 def remote_snapshots(names=path_segments(), authors=remote_authors()):
     """
     Build ``RemoteSnapshot`` instances.
@@ -377,10 +432,10 @@ def remote_snapshots(names=path_segments(), authors=remote_authors()):
         RemoteSnapshot,
         name=names,
         author=authors,
-        metadata=dictionaries(text(), text()),
-        capability=tahoe_lafs_immutable_dir_capabilities(),
-        parents_raw=lists(tahoe_lafs_immutable_dir_capabilities()),
-        content_cap=tahoe_lafs_chk_capabilities(),
+        metadata=_TEXT_DICTIONARIES,
+        capability=_IMMUTABLE_DIR_CAPABILITIES,
+        parents_raw=_IMMUTABLE_DIR_CAPABILITY_LISTS,
+        content_cap=_CHK_CAPABILITIES,
     )
 
 
@@ -404,9 +459,9 @@ def local_snapshots():
         LocalSnapshot,
         name=relative_paths(),
         author=local_authors(),
-        metadata=dictionaries(text(), text()),
+        metadata=_TEXT_DICTIONARIES,
         content_path=absolute_paths().map(FilePath),
         parents_local=just([]),
-        parents_remote=lists(tahoe_lafs_immutable_dir_capabilities()),
+        parents_remote=_IMMUTABLE_DIR_CAPABILITY_LISTS,
         identifier=uuids(),
     )
@@ -7,8 +7,22 @@ from twisted.internet.interfaces import (
     IStreamServerEndpoint,
 )
 from twisted.internet.defer import (
+    Deferred,
     succeed,
     failure,
+    CancelledError,
+)
+from twisted.test.proto_helpers import (
+    MemoryReactorClock,
+)
+from twisted.application.service import (
+    Service,
+)
+from twisted.web.resource import (
+    Resource,
+)
+from hyperlink import (
+    DecodedURL,
 )
 from twisted.python.filepath import (
     FilePath,
@@ -24,7 +38,21 @@ from testtools import (
 )
 from testtools.matchers import (
     Equals,
+    AfterPreprocessing,
     ContainsDict,
+    MatchesListwise,
+)
+from testtools.twistedsupport import (
+    succeeded,
+    failed,
+    has_no_result,
+)
+from allmydata.immutable.upload import (
+    Data,
+)
+from allmydata.uri import (
+    CHKFileURI,
+    from_string as uri_from_string,
 )
 from .common import (
     AsyncTestCase,
@@ -34,8 +62,12 @@ from .fixtures import (
     NodeDirectory,
 )
 from ..config import (
+    create_global_configuration,
     load_global_configuration,
 )
+from ..testing.web import (
+    create_tahoe_treq_client,
+)
 from ..endpoints import (
     CannotConvertEndpointError,
 )
@@ -51,6 +83,11 @@ from magic_folder.migrate import (
 from magic_folder.show_config import (
     magic_folder_show_config,
 )
+from magic_folder.cli import (
+    MagicFolderService,
+    TahoeClient,
+    _UploadableProducer,
+)
 
 
 @attr.s
@@ -225,3 +262,267 @@ class TestShowConfig(SyncTestCase):
                 u'magic_folders': Equals({}),
             })
         )
+
+
+@attr.s
+class Consumer(object):
+    """
+    A consumer which remembers every chunk written to it.
+
+    :ivar producer: If not ``None``, a producer to pause after every write,
+        as a consumer with a full buffer would.
+    """
+    written = attr.ib(default=attr.Factory(list))
+    producer = attr.ib(default=None)
+
+    def write(self, data):
+        self.written.append(data)
+        if self.producer is not None:
+            self.producer.pauseProducing()
+
+
+class TestUploadableProducer(SyncTestCase):
+    """
+    Confirm operation of magic_folder.cli._UploadableProducer
+    """
+
+    def test_produces_all_chunks(self):
+        """
+        All of the uploadable's data is written to the consumer, in chunks no
+        larger than the chunk size.
+        """
+        content = b"0123456789" * 10
+        producer = _UploadableProducer(
+            Data(content, convergence=None),
+            len(content),
+            chunk_size=7,
+        )
+        consumer = Consumer()
+        self.assertThat(
+            producer.startProducing(consumer),
+            succeeded(Equals(None)),
+        )
+        self.assertThat(b"".join(consumer.written), Equals(content))
+        self.assertThat(max(len(chunk) for chunk in consumer.written), Equals(7))
+
+    def _paused_producer(self):
+        """
+        Start a producer of 70 bytes, 7 at a time, for a consumer which pauses
+        it after every write.
+
+        :return: A three-tuple of the producer, the consumer and the
+            ``Deferred`` returned by ``startProducing``.
+        """
+        content = b"0123456789" * 7
+        producer = _UploadableProducer(
+            Data(content, convergence=None),
+            len(content),
+            chunk_size=7,
+        )
+        consumer = Consumer(producer=producer)
+        return producer, consumer, producer.startProducing(consumer)
+
+    def test_pause(self):
+        """
+        No more data is written while the producer is paused and production
+        continues when it is resumed.
+        """
+        producer, consumer, d = self._paused_producer()
+        self.assertThat(consumer.written, Equals([b"0123456"]))
+        self.assertThat(d, has_no_result())
+
+        producer.resumeProducing()
+        self.assertThat(consumer.written, Equals([b"0123456", b"7890123"]))
+        self.assertThat(d, has_no_result())
+
+        # Stop pausing and let it run to completion.
+        consumer.producer = None
+        producer.resumeProducing()
+        self.assertThat(d, succeeded(Equals(None)))
+        self.assertThat(b"".join(consumer.written), Equals(b"0123456789" * 7))
+
+    def test_stop(self):
+        """
+        No more data is written after the producer is stopped and the
+        ``Deferred`` returned by ``startProducing`` never fires.
+        """
+        producer, consumer, d = self._paused_producer()
+        producer.stopProducing()
+        producer.resumeProducing()
+        self.assertThat(consumer.written, Equals([b"0123456"]))
+        self.assertThat(d, has_no_result())
+
+    def test_cancel(self):
+        """
+        Cancelling the ``Deferred`` returned by ``startProducing`` stops
+        production and fails the ``Deferred`` with ``CancelledError``.
+        """
+        producer, consumer, d = self._paused_producer()
+        d.cancel()
+        producer.resumeProducing()
+        self.assertThat(consumer.written, Equals([b"0123456"]))
+        self.assertThat(
+            d,
+            failed(
+                AfterPreprocessing(
+                    lambda f: f.type,
+                    Equals(CancelledError),
+                ),
+            ),
+        )
+
+
+class _RecordingTahoe(Resource, object):
+    """
+    A stand-in for the Tahoe-LAFS web API which remembers the body of every
+    request and answers uploads with a fixed capability.
+
+    :ivar bytes filecap: The capability to answer uploads with.
+
+    :ivar list[(bytes, bytes)] requests: The method and body of each
+        request received, in order.
+    """
+    isLeaf = True
+
+    def __init__(self, filecap):
+        Resource.__init__(self)
+        self.filecap = filecap
+        self.requests = []
+
+    def render(self, request):
+        self.requests.append((request.method, request.content.read()))
+        if request.method == b"PUT":
+            return self.filecap
+        return b""
+
+
+class TestAddFile(SyncTestCase):
+    """
+    Tests for ``TahoeClient.add_file``.
+    """
+    def test_uploads_contents(self):
+        """
+        ``add_file`` uploads the contents of the uploadable and then links the
+        resulting capability into the directory with the given metadata.
+        """
+        content = b"".join(b"%d " % (n,) for n in range(100000))
+        filecap = CHKFileURI(
+            key=b"k" * 16,
+            uri_extension_hash=b"h" * 32,
+            needed_shares=1,
+            total_shares=1,
+            size=len(content),
+        ).to_string()
+        dirnode_uri = uri_from_string(
+            b"URI:DIR2:bgksdpr3lr2gvlvhydxjo2izea:dfdkjc44gg23n3fxcxd6ywsqvuuqzo4nrtqncrjzqmh4pamag2ia",
+        )
+        tahoe = _RecordingTahoe(filecap)
+        client = TahoeClient(
+            DecodedURL.from_text(u"http://example.invalid./"),
+            create_tahoe_treq_client(tahoe),
+        )
+        d = client.add_file(
+            dirnode_uri,
+            u"foo",
+            Data(content, convergence=None),
+            {u"version": 1},
+            False,
+            None,
+        )
+        self.assertThat(
+            d,
+            succeeded(
+                AfterPreprocessing(
+                    lambda node: node.get_uri(),
+                    Equals(filecap),
+                ),
+            ),
+        )
+        self.assertThat(
+            tahoe.requests,
+            MatchesListwise([
+                Equals((b"PUT", content)),
+                MatchesListwise([
+                    Equals(b"POST"),
+                    AfterPreprocessing(
+                        json.loads,
+                        Equals({
+                            u"foo": [
+                                u"filenode", {
+                                    u"ro_uri": filecap,
+                                    u"size": len(content),
+                                    u"metadata": {u"version": 1},
+                                },
+                            ],
+                        }),
+                    ),
+                ]),
+            ]),
+        )
+
+class _SlowStoppingService(Service):
+    """
+    A service which does not finish stopping until ``stopped`` fires.
+    """
+    def __init__(self):
+        self.stopped = Deferred()
+
+    def stopService(self):
+        Service.stopService(self)
+        return self.stopped
+
+
+class TestMagicFolderService(SyncTestCase):
+    """
+    Tests for ``MagicFolderService``'s management of its Tahoe-LAFS client.
+    """
+    def setUp(self):
+        super(TestMagicFolderService, self).setUp()
+        self.temp = FilePath(self.mktemp())
+        self.node_dir = self.useFixture(NodeDirectory(self.temp.child("node")))
+        self.config = create_global_configuration(
+            self.temp.child("magic"),
+            u"tcp:-1",
+            self.node_dir.path,
+            u"tcp:127.0.0.1:-1",
+        )
+
+    def test_default_client_uses_persistent_pool(self):
+        """
+        When no ``tahoe_client`` is given, the service creates one whose
+        requests go through a persistent connection pool it owns.
+        """
+        service = MagicFolderService(MemoryReactorClock(), self.config)
+        self.assertThat(service._http_pool.persistent, Equals(True))
+
+        # Agent asks its pool for a connection to the node for each request.
+        # Leave the connection pending: only which pool is asked matters.
+        requested = []
+
+        def get_connection(key, endpoint):
+            requested.append(key)
+            return Deferred()
+        service._http_pool.getConnection = get_connection
+
+        service.tahoe_client.get_welcome()
+        self.assertThat(len(requested), Equals(1))
+
+    def test_stop_closes_pool(self):
+        """
+        Stopping the service closes the cached connections in its pool, but
+        only after all of its child services have finished stopping.
+        """
+        service = MagicFolderService(MemoryReactorClock(), self.config)
+        closes = []
+        service._http_pool.closeCachedConnections = lambda: closes.append(None)
+        child = _SlowStoppingService()
+        child.setServiceParent(service)
+        service.startService()
+
+        d = service.stopService()
+        self.assertThat(closes, Equals([]))
+        self.assertThat(d, has_no_result())
+
+        child.stopped.callback(None)
+        self.assertThat(closes, Equals([None]))
+        self.assertThat(d, succeeded(Equals([])))
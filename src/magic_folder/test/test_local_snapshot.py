@@ -20,7 +20,6 @@ from twisted.internet import defer
 
 from testtools.matchers import (
     Equals,
-    Always,
     HasLength,
     MatchesStructure,
     AfterPreprocessing,
@@ -28,7 +27,6 @@ from testtools.matchers import (
     MatchesPredicate,
 )
 from testtools.twistedsupport import (
-    succeeded,
     failed,
 )
 
@@ -51,6 +49,8 @@ from ..config import (
 )
 from .common import (
     SyncTestCase,
+    TemporaryRootMixin,
+    write_content,
 )
 from .strategies import (
     path_segments,
@@ -76,7 +76,7 @@ class MemorySnapshotCreator(object):
         self.processed.append(path)
 
 
-class LocalSnapshotServiceTests(SyncTestCase):
+class LocalSnapshotServiceTests(TemporaryRootMixin, SyncTestCase):
     """
     Tests for ``LocalSnapshotService``.
     """
@@ -101,19 +101,13 @@ class LocalSnapshotServiceTests(SyncTestCase):
         """
         to_add = self.magic_path.preauthChild(relative_path)
         to_add.asBytesMode("utf-8").parent().makedirs(ignoreExistingDirectory=True)
-        to_add.asBytesMode("utf-8").setContent(content)
+        write_content(to_add, content)
 
         self.snapshot_service.startService()
 
-        self.assertThat(
-            self.snapshot_service.add_file(to_add),
-            succeeded(Always()),
-        )
+        self.successResultOf(self.snapshot_service.add_file(to_add))
 
-        self.assertThat(
-            self.snapshot_service.stopService(),
-            succeeded(Always())
-        )
+        self.successResultOf(self.snapshot_service.stopService())
 
         self.assertThat(
             self.snapshot_creator.processed,
@@ -131,7 +125,7 @@ class LocalSnapshotServiceTests(SyncTestCase):
         for filename in filenames:
             to_add = self.magic_path.child(filename)
             content = data.draw(binary())
-            to_add.asBytesMode("utf-8").setContent(content)
+            write_content(to_add, content)
             files.append(to_add)
 
         self.snapshot_service.startService()
@@ -143,15 +137,9 @@ class LocalSnapshotServiceTests(SyncTestCase):
 
         d = defer.gatherResults(list_d)
 
-        self.assertThat(
-            d,
-            succeeded(Always()),
-        )
+        self.successResultOf(d)
 
-        self.assertThat(
-            self.snapshot_service.stopService(),
-            succeeded(Always())
-        )
+        self.successResultOf(self.snapshot_service.stopService())
 
         self.assertThat(
             sorted(self.snapshot_creator.processed),
@@ -227,20 +215,21 @@ class LocalSnapshotServiceTests(SyncTestCase):
         )
 
 
-class LocalSnapshotCreatorTests(SyncTestCase):
+class LocalSnapshotCreatorTests(TemporaryRootMixin, SyncTestCase):
     """
     Tests for ``LocalSnapshotCreator``, responsible for creating the local
     snapshots and storing them in the database.
     """
-    def setUp(self):
-        super(LocalSnapshotCreatorTests, self).setUp()
-        self.author = create_local_author(u"alice")
+    # The author is never changed so every test can share one.
+    author = create_local_author(u"alice")
 
-    def setup_example(self):
+    def setUp(self):
         """
-        Hypothesis-invoked hook to create per-example state.
-        Reset the database before running each test.
+        Create the configuration and the magic folder once per test; building
+        them runs all of the schema setup which is too expensive to repeat
+        for every example.
         """
+        super(LocalSnapshotCreatorTests, self).setUp()
         self.temp = FilePath(self.mktemp())
         self.global_db = create_global_configuration(
             self.temp.child(b"global-db"),
@@ -265,6 +254,14 @@ class LocalSnapshotCreatorTests(SyncTestCase):
             stash_dir=self.db.stash_path,
         )
 
+    def setup_example(self):
+        """
+        Hypothesis-invoked hook to create per-example state.
+        Reset the database before running each test.
+        """
+        for name in self.db.get_all_localsnapshot_paths():
+            self.db.delete_localsnapshot(name)
+
     @given(lists(path_segments().map(lambda p: p.encode("utf-8")), unique=True),
            data())
     def test_create_snapshots(self, filenames, data_strategy):
@@ -277,15 +274,12 @@ class LocalSnapshotCreatorTests(SyncTestCase):
         for filename in filenames :
             file = self.magic.child(filename)
             content = data_strategy.draw(binary())
-            file.asBytesMode("utf-8").setContent(content)
+            write_content(file, content)
 
             files.append((file, content))
 
         for (file, _unused) in files:
-            self.assertThat(
-                self.snapshot_creator.store_local_snapshot(file),
-                succeeded(Always())
-            )
+            self.successResultOf(self.snapshot_creator.store_local_snapshot(file))
 
         self.assertThat(self.db.get_all_localsnapshot_paths(), HasLength(len(files)))
         for (file, content) in files:
@@ -305,25 +299,19 @@ class LocalSnapshotCreatorTests(SyncTestCase):
         should refer to the existing snapshot as a parent.
         """
         foo = self.magic.child(filename)
-        foo.asBytesMode("utf-8").setContent(content1)
+        write_content(foo, content1)
 
         # make sure the store_local_snapshot() succeeds
-        self.assertThat(
-            self.snapshot_creator.store_local_snapshot(foo),
-            succeeded(Always()),
-        )
+        self.successResultOf(self.snapshot_creator.store_local_snapshot(foo))
 
         foo_magicname = path2magic(foo.asTextMode('utf-8').path)
         stored_snapshot1 = self.db.get_local_snapshot(foo_magicname)
 
         # now modify the file with some new content.
-        foo.asBytesMode("utf-8").setContent(content2)
+        write_content(foo, content2)
 
         # make sure the second call succeeds as well
-        self.assertThat(
-            self.snapshot_creator.store_local_snapshot(foo),
-            succeeded(Always()),
-        )
+        self.successResultOf(self.snapshot_creator.store_local_snapshot(foo))
         stored_snapshot2 = self.db.get_local_snapshot(foo_magicname)
 
         self.assertThat(
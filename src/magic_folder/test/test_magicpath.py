@@ -14,9 +14,12 @@ from hypothesis import (
     assume,
 )
 from hypothesis.strategies import (
+    builds,
+    one_of,
     sampled_from,
     lists,
     randoms,
+    text,
 )
 
 from testtools.matchers import (
@@ -39,9 +42,47 @@ from ..magicpath import (
     path2magic,
     magic2path,
     should_ignore_file,
+    filter_non_ignored,
 )
 
 
+_IGNORED_SUFFIXES = [u"backup", u"tmp", u"conflict"]
+
+
+def _kept_paths():
+    """
+    Build relative paths which should not be ignored.
+    """
+    return relative_paths(path_segments_without_dotfiles()).filter(
+        lambda path: not any(
+            path.endswith(u"." + suffix)
+            for suffix
+            in _IGNORED_SUFFIXES
+        ),
+    )
+
+
+def _ignored_paths():
+    """
+    Build paths which should be ignored, each for one of the reasons paths
+    are ignored.
+    """
+    return one_of(
+        builds(
+            lambda path, suffix: path + u"." + suffix,
+            _kept_paths(),
+            sampled_from(_IGNORED_SUFFIXES),
+        ),
+        builds(
+            lambda before, segment, after: join(before, u"." + segment, after),
+            _kept_paths(),
+            path_segments(),
+            _kept_paths(),
+        ),
+        absolute_paths(_kept_paths()),
+    )
+
+
 class MagicPath(SyncTestCase):
     """
     Tests for handling of paths related to the contents of Magic Folders.
@@ -56,6 +97,17 @@ class MagicPath(SyncTestCase):
             Equals(path),
         )
 
+    @given(text(alphabet=u"@_/a"))
+    def test_roundtrip_escapes(self, path):
+        """
+        magic2path(path2magic(p)) == p for paths made up largely of the
+        characters involved in the mangling.
+        """
+        self.assertThat(
+            magic2path(path2magic(path)),
+            Equals(path),
+        )
+
     @given(relative_paths(), sampled_from([u"backup", u"tmp", u"conflict"]))
     def test_ignore_known_suffixes(self, path, suffix):
         """
@@ -108,3 +160,22 @@ class MagicPath(SyncTestCase):
             path,
             AfterPreprocessing(should_ignore_file, Equals(False)),
         )
+
+    @given(
+        lists(
+            one_of(
+                _kept_paths().map(lambda path: (path, True)),
+                _ignored_paths().map(lambda path: (path, False)),
+            ),
+        ),
+    )
+    def test_filter_non_ignored(self, tagged_paths):
+        """
+        ``filter_non_ignored`` drops paths with a well-known suffix, a dotfile
+        segment or an absolute path and keeps the others in their original
+        order.
+        """
+        self.assertThat(
+            filter_non_ignored([path for (path, kept) in tagged_paths]),
+            Equals([path for (path, kept) in tagged_paths if kept]),
+        )
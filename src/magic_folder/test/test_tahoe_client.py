@@ -34,6 +34,7 @@ from hypothesis.strategies import (
     text,
     dictionaries,
     just,
+    lists,
 )
 
 from testtools.matchers import (
@@ -42,6 +43,8 @@ from testtools.matchers import (
     IsInstance,
     Equals,
     Always,
+    MatchesStructure,
+    Is,
 )
 
 from testtools.twistedsupport import (
@@ -50,13 +53,17 @@ from testtools.twistedsupport import (
 )
 
 from twisted.internet.defer import (
+    Deferred,
     gatherResults,
+    succeed,
+    fail,
 )
 from twisted.web.http import (
     GONE,
 )
 
 from ..tahoe_client import (
+    _MAX_CONCURRENT_UPLOADS,
     TahoeAPIError,
     create_tahoe_client
 )
@@ -144,6 +151,78 @@ class TahoeClientTests(SyncTestCase):
             ),
         )
 
+    @given(lists(binary()))
+    def test_create_immutables(self, datas):
+        """
+        Several immutable objects can be stored with ``create_immutables`` and
+        their capabilities are given in the same order as the data.
+        """
+        self.assertThat(
+            self.tahoe_client.create_immutables(datas),
+            succeeded(
+                AfterPreprocessing(
+                    lambda caps: [self.root._uri.data[cap] for cap in caps],
+                    Equals(datas),
+                ),
+            ),
+        )
+
+    def test_create_immutables_limited(self):
+        """
+        ``create_immutables`` has at most ``_MAX_CONCURRENT_UPLOADS`` uploads in
+        progress at once and starts another as each one finishes.
+        """
+        self.setup_client()
+        uploads = []
+
+        def create_immutable(producer):
+            d = Deferred()
+            uploads.append((producer, d))
+            return d
+        self.tahoe_client.create_immutable = create_immutable
+
+        datas = [b"%d" % (n,) for n in range(_MAX_CONCURRENT_UPLOADS + 2)]
+        result = self.tahoe_client.create_immutables(datas)
+        self.assertThat(len(uploads), Equals(_MAX_CONCURRENT_UPLOADS))
+
+        producer, d = uploads[0]
+        d.callback(b"URI:CHK:" + producer)
+        self.assertThat(len(uploads), Equals(_MAX_CONCURRENT_UPLOADS + 1))
+
+        for producer, d in uploads[1:]:
+            d.callback(b"URI:CHK:" + producer)
+        # The last upload only starts once an earlier one has finished.
+        producer, d = uploads[-1]
+        d.callback(b"URI:CHK:" + producer)
+        self.assertThat(
+            result,
+            succeeded(Equals([b"URI:CHK:" + data for data in datas])),
+        )
+
+    def test_create_immutables_failure(self):
+        """
+        If one of the uploads made by ``create_immutables`` fails then the
+        result fails with that upload's exception.
+        """
+        self.setup_client()
+        error = TahoeAPIError(GONE, b"gone")
+
+        def create_immutable(producer):
+            if producer == b"bad":
+                return fail(error)
+            return succeed(b"URI:CHK:" + producer)
+        self.tahoe_client.create_immutable = create_immutable
+
+        self.assertThat(
+            self.tahoe_client.create_immutables([b"good", b"bad", b"good"]),
+            failed(
+                AfterPreprocessing(
+                    lambda failure: failure.value,
+                    Is(error),
+                ),
+            ),
+        )
+
     @given(binary())
     def test_download_immutable(self, data):
         """
@@ -206,6 +285,32 @@ class TahoeClientTests(SyncTestCase):
             partial(self.tahoe_client.stream_capability, cap, output),
         )
 
+    @given(tahoe_lafs_chk_capabilities())
+    def test_stream_immutable_error_body(self, cap):
+        """
+        When ``stream_capability`` fails because of an error response, the
+        ``TahoeAPIError`` carries the response's code and body and nothing is
+        written to the output.
+        """
+        output = BytesIO()
+        self.assertThat(
+            self.tahoe_client.stream_capability(cap, output),
+            failed(
+                AfterPreprocessing(
+                    lambda failure: failure.value,
+                    MatchesStructure(
+                        code=Equals(GONE),
+                        body=Equals(
+                            u"No data for '{}'".format(
+                                cap.decode("ascii"),
+                            ).encode("ascii"),
+                        ),
+                    ),
+                ),
+            ),
+        )
+        self.assertThat(output.getvalue(), Equals(b""))
+
     @given(
         directory_children()
     )
@@ -10,8 +10,15 @@ from __future__ import (
     unicode_literals,
 )
 
-from json import (
-    loads,
+from atexit import (
+    register,
+)
+from shutil import (
+    copytree,
+    rmtree,
+)
+from tempfile import (
+    mkdtemp,
 )
 
 from hyperlink import (
@@ -21,6 +28,9 @@ from hyperlink import (
 from hypothesis import (
     given,
     assume,
+    settings,
+    HealthCheck,
+    Phase,
 )
 
 from hypothesis.strategies import (
@@ -42,7 +52,6 @@ from testtools.matchers import (
 )
 from testtools.twistedsupport import (
     succeeded,
-    has_no_result,
 )
 
 from twisted.web.http import (
@@ -56,6 +65,13 @@ from twisted.web.http import (
 from twisted.internet.task import Clock
 from twisted.web.resource import (
     Resource,
+    getChildForRequest,
+)
+from twisted.web.server import (
+    NOT_DONE_YET,
+)
+from twisted.web.test.requesthelper import (
+    DummyRequest,
 )
 from twisted.web.static import (
     Data,
@@ -78,6 +94,8 @@ from allmydata.util.base32 import (
 
 from .common import (
     SyncTestCase,
+    TemporaryRootMixin,
+    write_content,
 )
 from .matchers import (
     matches_response,
@@ -106,8 +124,12 @@ from ..config import (
     create_global_configuration,
     load_global_configuration,
 )
+from ..util.jsonutil import (
+    loads,
+)
 from ..client import (
     create_testing_http_client,
+    create_testing_resource,
     authorized_request,
     url_to_bytes,
 )
@@ -119,16 +141,68 @@ from .strategies import (
 # for authorization can use this because don't need Hypothesis to
 # comprehensively explore the authorization token input space in those tests.
 AUTH_TOKEN = b"0" * 16
+AUTH_HEADER = b"Bearer " + AUTH_TOKEN
+
+# Settings for tests which set up a whole Magic Folder service for each
+# example.  Their cost is dominated by that setup rather than by the
+# property being checked so run fewer examples and skip shrinking.
+fixture_heavy = settings(
+    max_examples=min(20, settings.default.max_examples),
+    deadline=None,
+    suppress_health_check=[HealthCheck.too_slow],
+    phases=[Phase.explicit, Phase.reuse, Phase.generate],
+)
+
+
+class _FixedPathResource(Resource, object):
+    """
+    A resource which makes one other resource available at one path beneath
+    it without building a resource for each segment of that path.
+
+    Traversal consumes the path so an instance can serve only one request.
+
+    :ivar [bytes] _remaining: The path segments not yet traversed.
+
+    :ivar IResource _leaf: The resource at the end of the path.
+    """
+    def __init__(self, segments, leaf):
+        Resource.__init__(self)
+        self._remaining = segments
+        self._leaf = leaf
+
+    def getChild(self, name, request):
+        if self._remaining and name == self._remaining[0]:
+            del self._remaining[0]
+            if self._remaining:
+                return self
+            return self._leaf
+        return Resource.getChild(self, name, request)
+
+    def render(self, request):
+        if self._remaining:
+            return Resource.render(self, request)
+        # The path is empty so this resource stands in for the leaf.
+        return self._leaf.render(request)
 
 
 class AuthorizationTests(SyncTestCase):
     """
     Tests for the authorization requirements for resources beneath ``/v1``.
     """
+    def setUp(self):
+        super(AuthorizationTests, self).setUp()
+        # An unauthorized request is refused before the resource tree is
+        # consulted so one tree can serve every example, with each example
+        # only setting the token it considers good.
+        self.good_token = None
+        self.unauthorized_treq = StubTreq(
+            magic_folder_resource(lambda: self.good_token, Resource()),
+        )
+
     @given(
         good_token=tokens(),
-        bad_tokens=lists(tokens()),
-        child_segments=lists(text()),
+        bad_tokens=lists(tokens(), max_size=3),
+        child_segments=lists(text(), max_size=3),
     )
     def test_unauthorized(self, good_token, bad_tokens, child_segments):
         """
@@ -151,11 +225,8 @@ class AuthorizationTests(SyncTestCase):
         # the authorized case by mistake.
         assume([good_token] != bad_tokens)
 
-        def get_auth_token():
-            return good_token
-
-        root = magic_folder_resource(get_auth_token, Resource())
-        treq = StubTreq(root)
+        self.good_token = good_token
+        treq = self.unauthorized_treq
         url = DecodedURL.from_text(u"http://example.invalid./v1").child(*child_segments)
         encoded_url = url_to_bytes(url)
 
@@ -163,11 +234,12 @@ class AuthorizationTests(SyncTestCase):
         # unauthorized response.
         headers = {}
         if bad_tokens:
-            headers[b"Authorization"] = list(
-                u"Bearer {}".format(bad_token).encode("ascii")
+            # tokens() builds bytes so there's no need to go through text.
+            headers[b"Authorization"] = [
+                b"Bearer " + bad_token
                 for bad_token
                 in bad_tokens
-            )
+            ]
 
         self.assertThat(
             treq.get(
@@ -181,7 +253,7 @@ class AuthorizationTests(SyncTestCase):
 
     @given(
         auth_token=tokens(),
-        child_segments=lists(path_segments()),
+        child_segments=lists(path_segments(), max_size=3),
         content=binary(),
     )
     def test_authorized(self, auth_token, child_segments, content):
@@ -203,16 +275,13 @@ class AuthorizationTests(SyncTestCase):
 
         # Since we don't want to exercise any real magic-folder application
         # logic we'll just magic up the child resource being requested.
-        branch = Data(
-            content,
-            b"application/binary",
+        branch = _FixedPathResource(
+            [segment.encode("utf-8") for segment in child_segments],
+            Data(
+                content,
+                b"application/binary",
+            ),
         )
-        segments_remaining = child_segments[:]
-        while segments_remaining:
-            name = segments_remaining.pop()
-            resource = Resource()
-            resource.putChild(name.encode("utf-8"), branch)
-            branch = resource
 
         root = magic_folder_resource(
             get_auth_token,
@@ -243,42 +312,51 @@ class AuthorizationTests(SyncTestCase):
         )
 
 
-def treq_for_folders(reactor, basedir, auth_token, folders, start_folder_services):
+_config_template = []
+
+def _global_config_template():
     """
-    Construct a ``treq``-module-alike which is hooked up to a Magic Folder
-    service with Magic Folders like the ones given.
+    Get a directory holding a global configuration with no folders, creating
+    it the first time this is called.
 
-    :param reactor: A reactor to give to the ``MagicFolderService`` which will
-        back the HTTP interface.
+    Creating a configuration from scratch runs all of the database schema
+    setup.  Copying an existing one is much cheaper and it is done for every
+    example of many tests.
 
-    :param FilePath basedir: A non-existant directory to create and populate
-        with a new Magic Folder service configuration.
+    :return FilePath: The template configuration directory.
+    """
+    if not _config_template:
+        template = FilePath(mkdtemp()).child(u"template")
+        register(rmtree, template.parent().path)
+        config = create_global_configuration(
+            template,
+            # Make this endpoint string and the one below parse but make them
+            # invalid, too, because we don't want anything to start listening
+            # on these during this set of tests.
+            #
+            # https://github.com/LeastAuthority/magic-folder/issues/276
+            u"tcp:-1",
+            # It wants to know where the Tahoe-LAFS node directory is but we
+            # don't have one and we don't want to invoke any functionality
+            # that requires one.  Give it something bogus.
+            FilePath(u"/non-tahoe-directory"),
+            u"tcp:127.0.0.1:-1",
+        )
+        config.database.close()
+        _config_template.append(template)
+    return _config_template[0]
 
-    :param unicode auth_token: The authorization token accepted by the
-        service.
 
-    :param folders: A mapping from Magic Folder names to their configurations.
-        These are the folders which will appear to exist.
+def _services_for_folders(reactor, basedir, folders, start_folder_services):
+    """
+    Create a Magic Folder service with Magic Folders like the ones given.
 
-    :param bool start_folder_services: If ``True``, start the Magic Folder
-        service objects.  Otherwise, don't.
+    See ``treq_for_folders`` for parameter details.
 
-    :return: An object like the ``treq`` module.
+    :return: A two-tuple of the global configuration and the global service.
     """
-    global_config = create_global_configuration(
-        basedir,
-        # Make this endpoint string and the one below parse but make them
-        # invalid, too, because we don't want anything to start listening on
-        # these during this set of tests.
-        #
-        # https://github.com/LeastAuthority/magic-folder/issues/276
-        u"tcp:-1",
-        # It wants to know where the Tahoe-LAFS node directory is but we don't
-        # have one and we don't want to invoke any functionality that requires
-        # one.  Give it something bogus.
-        FilePath(u"/non-tahoe-directory"),
-        u"tcp:127.0.0.1:-1",
-    )
+    copytree(_global_config_template().path, basedir.path)
+    global_config = load_global_configuration(basedir)
     for name, config in folders.items():
         global_config.create_magic_folder(
             name,
@@ -307,9 +385,64 @@ def treq_for_folders(reactor, basedir, auth_token, folders, start_folder_service
         for name in folders:
             global_service.get_folder_service(name).startService()
 
+    return global_config, global_service
+
+
+def treq_for_folders(reactor, basedir, auth_token, folders, start_folder_services):
+    """
+    Construct a ``treq``-module-alike which is hooked up to a Magic Folder
+    service with Magic Folders like the ones given.
+
+    :param reactor: A reactor to give to the ``MagicFolderService`` which will
+        back the HTTP interface.
+
+    :param FilePath basedir: A non-existant directory to create and populate
+        with a new Magic Folder service configuration.
+
+    :param unicode auth_token: The authorization token accepted by the
+        service.
+
+    :param folders: A mapping from Magic Folder names to their configurations.
+        These are the folders which will appear to exist.
+
+    :param bool start_folder_services: If ``True``, start the Magic Folder
+        service objects.  Otherwise, don't.
+
+    :return: An object like the ``treq`` module.
+    """
+    global_config, global_service = _services_for_folders(
+        reactor,
+        basedir,
+        folders,
+        start_folder_services,
+    )
     return create_testing_http_client(reactor, global_config, global_service, lambda: auth_token)
 
 
+def resource_for_folders(reactor, basedir, auth_token, folders, start_folder_services):
+    """
+    Construct the root HTTP API resource of a Magic Folder service with Magic
+    Folders like the ones given.
+
+    See ``treq_for_folders`` for parameter details.
+
+    :return IResource: The root resource.
+    """
+    global_config, global_service = _services_for_folders(
+        reactor,
+        basedir,
+        folders,
+        start_folder_services,
+    )
+    return create_testing_resource(global_config, global_service, lambda: auth_token)
+
+
+# Every folder can use the same capabilities since none of these tests ever
+# talk to Tahoe-LAFS.
+COLLECTIVE_DIRCAP = u"URI:DIR2-RO:{}:{}".format(b2a("\0" * 16), b2a("\1" * 32))
+UPLOAD_DIRCAP = u"URI:DIR2:{}:{}".format(b2a("\2" * 16), b2a("\3" * 32))
+
+
 def magic_folder_config(author, state_path, local_directory):
     # see also treq_for_folders() where these dicts are turned into
     # real magic-folder configs
@@ -317,22 +450,41 @@ def magic_folder_config(author, state_path, local_directory):
         u"magic-path": local_directory,
         u"state-path": state_path,
         u"author": author,
-        u"collective-dircap": u"URI:DIR2-RO:{}:{}".format(b2a("\0" * 16), b2a("\1" * 32)),
-        u"upload-dircap": u"URI:DIR2:{}:{}".format(b2a("\2" * 16), b2a("\3" * 32)),
+        u"collective-dircap": COLLECTIVE_DIRCAP,
+        u"upload-dircap": UPLOAD_DIRCAP,
         u"poll-interval": 60,
     }
 
 
-class ListMagicFolderTests(SyncTestCase):
+class ListMagicFolderTests(TemporaryRootMixin, SyncTestCase):
     """
     Tests for listing Magic Folders using **GET /v1/magic-folder** and
     ``V1MagicFolderAPI``.
     """
     url = DecodedURL.from_text(u"http://example.invalid./v1/magic-folder")
 
+    # The author is never changed so every test can share one.
+    author = create_local_author(u"alice")
+
     def setUp(self):
         super(ListMagicFolderTests, self).setUp()
-        self.author = create_local_author(u"alice")
+        self._treq_for_no_folders = None
+
+    def treq_for_no_folders(self):
+        """
+        Get a ``treq``-module-alike hooked up to a Magic Folder service with no
+        folders.  Such a service is the same for every example so it is only
+        created once per test.
+        """
+        if self._treq_for_no_folders is None:
+            self._treq_for_no_folders = treq_for_folders(
+                object(),
+                FilePath(self.mktemp()),
+                AUTH_TOKEN,
+                {},
+                False,
+            )
+        return self._treq_for_no_folders
 
     @given(
         sampled_from([b"PUT", b"POST", b"PATCH", b"DELETE", b"OPTIONS"]),
@@ -342,7 +494,7 @@ class ListMagicFolderTests(SyncTestCase):
         A request to **/v1/magic-folder** with a method other than **GET**
         receives a NOT ALLOWED or NOT IMPLEMENTED response.
         """
-        treq = treq_for_folders(object(), FilePath(self.mktemp()), AUTH_TOKEN, {}, False)
+        treq = self.treq_for_no_folders()
         self.assertThat(
             authorized_request(treq, AUTH_TOKEN, method, self.url),
             succeeded(
@@ -355,12 +507,15 @@ class ListMagicFolderTests(SyncTestCase):
             ),
         )
 
+    @fixture_heavy
     @given(
         dictionaries(
             folder_names(),
             # We need absolute paths but at least we can make them beneath the
             # test working directory.
             relative_paths().map(FilePath),
+            # Each folder is expensive to create; a few are enough.
+            max_size=4,
         ),
     )
     def test_list_folders(self, folders):
@@ -398,6 +553,21 @@ class ListMagicFolderTests(SyncTestCase):
             name: config.get_magic_folder(name)
             for name in config.list_magic_folders()
         }
+        expected_body = {
+            name: {
+                u"name": name,
+                u"author": {
+                    u"name": config.author.name,
+                    u"verify_key": config.author.verify_key.encode(Base32Encoder),
+                },
+                u"magic_path": config.magic_path.path,
+                u"stash_path": config.stash_path.path,
+                u"poll_interval": config.poll_interval,
+                u"is_admin": config.is_admin(),
+            }
+            for name, config
+            in expected_folders.items()
+        }
 
         self.assertThat(
             authorized_request(treq, AUTH_TOKEN, b"GET", self.url),
@@ -409,34 +579,21 @@ class ListMagicFolderTests(SyncTestCase):
                     }),
                     body_matcher=AfterPreprocessing(
                         loads,
-                        Equals({
-                            name: {
-                                u"name": name,
-                                u"author": {
-                                    u"name": config.author.name,
-                                    u"verify_key": config.author.verify_key.encode(Base32Encoder),
-                                },
-                                u"magic_path": config.magic_path.path,
-                                u"stash_path": config.stash_path.path,
-                                u"poll_interval": config.poll_interval,
-                                u"is_admin": config.is_admin(),
-                            }
-                            for name, config
-                            in expected_folders.items()
-                        }),
+                        Equals(expected_body),
                     ),
                 ),
             ),
         )
 
 
-class CreateSnapshotTests(SyncTestCase):
+class CreateSnapshotTests(TemporaryRootMixin, SyncTestCase):
     """
     Tests for creating a new snapshot in an existing Magic Folder using a
     **POST**.
     """
     url = DecodedURL.from_text(u"http://example.invalid./v1/snapshot")
 
+    @fixture_heavy
     @given(
         local_authors(),
         folder_names(),
@@ -448,18 +605,22 @@ class CreateSnapshotTests(SyncTestCase):
         A **POST** request to **/v1/snapshot/:folder-name** does not receive a
         response before the snapshot has been created in the local database.
         """
-        local_path = FilePath(self.mktemp())
+        local_path, basedir, state_path = self.temporary_paths(
+            u"local",
+            u"base",
+            u"state",
+        )
         local_path.makedirs()
 
         some_file = local_path.preauthChild(path_in_folder).asBytesMode("utf-8")
         some_file.parent().makedirs(ignoreExistingDirectory=True)
-        some_file.setContent(some_content)
+        write_content(some_file, some_content)
 
-        treq = treq_for_folders(
+        root = resource_for_folders(
             object(),
-            FilePath(self.mktemp()),
+            basedir,
             AUTH_TOKEN,
-            {folder_name: magic_folder_config(author, FilePath(self.mktemp()), local_path)},
+            {folder_name: magic_folder_config(author, state_path, local_path)},
             # The interesting behavior of this test hinges on this flag.  We
             # decline to start the folder services here.  Therefore, no local
             # snapshots will ever be created.  This lets us observe the
@@ -470,16 +631,23 @@ class CreateSnapshotTests(SyncTestCase):
             start_folder_services=False,
         )
 
+        # Only the resource's handling of the request is interesting here so
+        # render it directly rather than through an HTTP client and server.
+        request = DummyRequest([b"v1", b"snapshot", folder_name.encode("utf-8")])
+        request.method = b"POST"
+        request.args = {b"path": [path_in_folder.encode("utf-8")]}
+        request.requestHeaders.setRawHeaders(
+            b"Authorization",
+            [AUTH_HEADER],
+        )
+        resource = getChildForRequest(root, request)
+
         self.assertThat(
-            authorized_request(
-                treq,
-                AUTH_TOKEN,
-                b"POST",
-                self.url.child(folder_name).set(u"path", path_in_folder),
-            ),
-            has_no_result(),
+            (resource.render(request), request.finished),
+            Equals((NOT_DONE_YET, 0)),
         )
 
+    @fixture_heavy
     @given(
         local_authors(),
         folder_names(),
@@ -491,7 +659,11 @@ class CreateSnapshotTests(SyncTestCase):
         **/v1/snapshot/<folder-name>** receives a response with an HTTP error
         code.
         """
-        local_path = FilePath(self.mktemp())
+        local_path, basedir, state_path = self.temporary_paths(
+            u"local",
+            u"base",
+            u"state",
+        )
         local_path.makedirs()
 
         # You may not create a snapshot of a directory.
@@ -500,9 +672,9 @@ class CreateSnapshotTests(SyncTestCase):
 
         treq = treq_for_folders(
             object(),
-            FilePath(self.mktemp()),
+            basedir,
             AUTH_TOKEN,
-            {folder_name: magic_folder_config(author, FilePath(self.mktemp()), local_path)},
+            {folder_name: magic_folder_config(author, state_path, local_path)},
             # This test carefully targets a failure mode that doesn't require
             # the service to be running.
             start_folder_services=False,
@@ -533,6 +705,7 @@ class CreateSnapshotTests(SyncTestCase):
             ),
         )
 
+    @fixture_heavy
     @given(
         local_authors(),
         folder_names(),
@@ -545,71 +718,77 @@ class CreateSnapshotTests(SyncTestCase):
         creates a new local snapshot for the file at the given path in the
         named folder.
         """
-        local_path = FilePath(self.mktemp())
+        local_path, basedir, state_path = self.temporary_paths(
+            u"local",
+            u"base",
+            u"state",
+        )
         local_path.makedirs()
 
         some_file = local_path.preauthChild(path_in_folder).asBytesMode("utf-8")
         some_file.parent().makedirs(ignoreExistingDirectory=True)
-        some_file.setContent(some_content)
+        write_content(some_file, some_content)
 
         treq = treq_for_folders(
             Clock(),
-            FilePath(self.mktemp()),
+            basedir,
             AUTH_TOKEN,
-            {folder_name: magic_folder_config(author, FilePath(self.mktemp()), local_path)},
+            {folder_name: magic_folder_config(author, state_path, local_path)},
             # Unlike test_wait_for_completion above we start the folder
             # services.  This will allow the local snapshot to be created and
             # our request to receive a response.
             start_folder_services=True,
         )
-        self.assertThat(
-            authorized_request(
-                treq,
-                AUTH_TOKEN,
-                b"POST",
-                self.url.child(folder_name).set(u"path", path_in_folder),
-            ),
-            succeeded(
-                matches_response(
-                    code_matcher=Equals(CREATED),
-                ),
-            ),
+        expected_author = author.to_remote_author().to_json()
+
+        # StubTreq handles each request completely before returning so the
+        # GET is only issued after the snapshot has been created.
+        post_d = authorized_request(
+            treq,
+            AUTH_TOKEN,
+            b"POST",
+            self.url.child(folder_name).set(u"path", path_in_folder),
+        )
+        get_d = authorized_request(
+            treq,
+            AUTH_TOKEN,
+            b"GET",
+            self.url,
         )
 
         self.assertThat(
-            authorized_request(
-                treq,
-                AUTH_TOKEN,
-                b"GET",
-                self.url,
+            self.successResultOf(post_d),
+            matches_response(
+                code_matcher=Equals(CREATED),
             ),
-            succeeded(
-                matches_response(
-                    code_matcher=Equals(OK),
-                    headers_matcher=header_contains({
-                        u"Content-Type": Equals([u"application/json"]),
-                    }),
-                    body_matcher=AfterPreprocessing(
-                        loads,
-                        MatchesDict({
-                            folder_name: MatchesDict({
-                                path_in_folder: MatchesListwise([
-                                    MatchesDict({
-                                        u"type": Equals(u"local"),
-                                        u"identifier": is_hex_uuid(),
-                                        # XXX It would be nice to see some
-                                        # parents if there are any.
-                                        u"parents": Equals([]),
-                                        u"content-path": AfterPreprocessing(
-                                            lambda path: FilePath(path).getContent(),
-                                            Equals(some_content),
-                                        ),
-                                        u"author": Equals(author.to_remote_author().to_json()),
-                                    }),
-                                ]),
-                            }),
+        )
+        self.assertThat(
+            self.successResultOf(get_d),
+            matches_response(
+                code_matcher=Equals(OK),
+                headers_matcher=header_contains({
+                    u"Content-Type": Equals([u"application/json"]),
+                }),
+                body_matcher=AfterPreprocessing(
+                    loads,
+                    MatchesDict({
+                        folder_name: MatchesDict({
+                            path_in_folder: MatchesListwise([
+                                MatchesDict({
+                                    u"type": Equals(u"local"),
+                                    u"identifier": is_hex_uuid(),
+                                    # XXX It would be nice to see some
+                                    # parents if there are any.
+                                    u"parents": Equals([]),
+                                    u"content-path": AfterPreprocessing(
+                                        lambda path: FilePath(path).getContent(),
+                                        Equals(some_content),
+                                    ),
+                                    u"author": Equals(expected_author),
+                                }),
+                            ]),
                         }),
-                    ),
+                    }),
                 ),
             ),
         )
@@ -478,6 +478,22 @@ class _SynchronousProducer(object):
         return succeed(None)
 
 
+def _data_to_body_producer(data):
+    """
+    Make a body producer for ``data`` which a ``RequestTraversalAgent`` can
+    send synchronously.
+
+    :param data: ``bytes``, a ``FileBodyProducer`` or some other
+        ``IBodyProducer``.  Other producers are used as they are: they
+        stream their data to the request themselves.
+
+    :return IBodyProducer: The producer to send.
+    """
+    if IBodyProducer.providedBy(data) and not isinstance(data, FileBodyProducer):
+        return data
+    return _SynchronousProducer(data)
+
+
 def create_tahoe_treq_client(root=None):
     """
     :param root: an instance created via `create_fake_tahoe_root`. The
@@ -493,6 +509,6 @@ def create_tahoe_treq_client(root=None):
 
     client = HTTPClient(
         agent=RequestTraversalAgent(root),
-        data_to_body_producer=_SynchronousProducer,
+        data_to_body_producer=_data_to_body_producer,
     )
     return client
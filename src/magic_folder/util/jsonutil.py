@@ -0,0 +1,80 @@
+# Copyright 2020 Least Authority TFA GmbH
+# See COPYING for details.
+
+"""
+JSON serialization and deserialization helpers.
+
+``orjson`` is used when it is available because it is considerably faster
+than the standard library encoder and decoder.  Otherwise we fall back to
+``json``, configured to produce the same compact UTF-8 output as ``orjson``
+so that serialized documents (and so the capabilities of anything uploaded)
+do not depend on which encoder is installed.  ``orjson`` only supports
+Python 3 so the ``orjson`` branch is never exercised by this project's py27
+tox environments.
+"""
+
+from uuid import (
+    UUID,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+def _default(obj):
+    """
+    Serialize values the JSON encoder does not natively support.  Capability
+    strings, signatures and some paths are carried around as ``bytes``
+    (which ``orjson`` does not accept).  They are decoded as UTF-8, as
+    ``json`` does on Python 2.  ``UUID`` instances are encoded in their
+    canonical hyphenated form (as ``orjson`` does on its own).
+    """
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8")
+    if isinstance(obj, UUID):
+        return u"{}".format(obj)
+    raise TypeError("Type is not JSON serializable: {}".format(type(obj)))
+
+
+if orjson is None:
+    # Match orjson: no whitespace and non-ASCII characters left unescaped.
+    _encoder = json.JSONEncoder(
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=_default,
+    )
+
+
+def dumps(obj):
+    """
+    Serialize ``obj`` as JSON.
+
+    :param obj: Any JSON-able object.
+
+    :return bytes: The UTF-8 encoded JSON representation of ``obj``.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    # On Python 2 the chunks are a mix of UTF-8 ``bytes`` and ``unicode``
+    # which cannot be joined directly if both contain non-ASCII characters.
+    return b"".join(
+        chunk if isinstance(chunk, bytes) else chunk.encode("utf-8")
+        for chunk
+        in _encoder.iterencode(obj)
+    )
+
+
+def loads(data):
+    """
+    Deserialize a JSON document.
+
+    :param bytes data: The UTF-8 encoded JSON document.
+
+    :return: The object ``data`` represents.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)